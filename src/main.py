@@ -1,23 +1,123 @@
 import argparse
+import functools
 import getpass
 import hashlib
 import json
 import os
 import sys
-from datetime import datetime
-from typing import List, Optional
+import time
+from typing import List, Optional, Tuple
+
+import numpy as np
+import orjson
 
 from src.retrieval.embedder import LocalEmbedder
-from src.retrieval.similarity import build_candidates
+from src.retrieval.similarity import (
+    DocMeta,
+    build_candidates,
+    load_doc_meta,
+    load_doc_vectors,
+)
+
+HASH_CACHE_PATH = os.path.join(".riswis_cache", "hash_cache.json")
+
+
+@functools.lru_cache(maxsize=32)
+def _load_json_cached(path: str, mtime_ns: int):
+    """
+    Parse a JSON file once per (path, mtime_ns).
+
+    The mtime is part of the cache key so an edited file is re-read.
+    The parsed object is shared between callers and must not be mutated.
+    """
+    with open(path, "rb") as f:
+        return orjson.loads(f.read())
+
+
+def _load_json(path: str):
+    return _load_json_cached(path, os.stat(path).st_mtime_ns)
 
 
 def load_config(path: str) -> dict:
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    return _load_json(path)
+
+
+def tier_multiplier_vector(meta: DocMeta, tier_multipliers: dict) -> np.ndarray:
+    """
+    Per-row tier multipliers aligned with the cached embeddings.
+
+    Built once per run, before any query work, so scoring is a single
+    multiply. One dict lookup per distinct tier, then a gather by code.
+    """
+    for tier in meta.tier_vocab:
+        if tier not in tier_multipliers:
+            raise ValueError(f"Unknown tier '{tier}' in manifest/config.")
+
+    lut = np.array([tier_multipliers[t] for t in meta.tier_vocab], dtype=np.float64)
+    return lut[meta.tier_codes]
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Row indices of the k highest scores, best first.
+
+    O(N) partition to find the k-th largest score, then a sort of the
+    k survivors only. Ties resolve to the lower row index, matching a
+    stable descending sort of all rows.
+    """
+    n = scores.shape[0]
+    k = min(k, n)
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+
+    kth = np.partition(scores, n - k)[n - k]
+    above = np.flatnonzero(scores > kth)
+    ties = np.flatnonzero(scores == kth)[: k - above.shape[0]]
+    idx = np.concatenate((above, ties))
+
+    return idx[np.lexsort((idx, -scores[idx]))]
 
 
-def rank_results(results: List[dict]) -> List[dict]:
-    return sorted(results, key=lambda x: x["weighted_score"], reverse=True)
+def score_and_top_k(
+    sims: np.ndarray, mults: np.ndarray, k: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Apply per-row tier multipliers and select the k best rows.
+
+    Scoring is a single vectorized multiply (float64, matching the
+    previous per-row Python arithmetic) feeding straight into the O(N)
+    top-k selection.
+
+    Returns
+    -------
+    (weighted, top)
+        weighted: shape (N,) weighted scores.
+        top: row indices of the k best weighted scores, best first.
+    """
+    weighted = np.multiply(sims, mults, dtype=np.float64)
+    return weighted, top_k_indices(weighted, k)
+
+
+def rank_of(scores: np.ndarray, idx: np.ndarray) -> np.ndarray:
+    """
+    1-based positions of rows idx in a stable descending sort of scores.
+
+    Counts the rows ranked ahead of each selected row instead of sorting
+    all rows. Work is done in blocks of selected rows to bound the size
+    of the temporary comparison matrix.
+    """
+    n = scores.shape[0]
+    rows = np.arange(n)
+    ranks = np.empty(idx.shape[0], dtype=np.int64)
+    step = max(1, (1 << 22) // max(n, 1))
+
+    for start in range(0, idx.shape[0], step):
+        sel = idx[start : start + step, None]
+        s = scores[sel]
+        ahead = (scores > s) | ((scores == s) & (rows < sel))
+        ranks[start : start + step] = 1 + np.count_nonzero(ahead, axis=1)
+
+    return ranks
 
 
 def load_embeddings_manifest(path: str) -> dict:
@@ -25,8 +125,7 @@ def load_embeddings_manifest(path: str) -> dict:
     Load minimal embedding metadata produced by Phase 2 doc embedding precompute.
     Expected file: data/embeddings_manifest.json
     """
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    return _load_json(path)
 
 
 def load_manifest_docs(manifest_path: str) -> List[dict]:
@@ -46,8 +145,7 @@ def load_manifest_docs(manifest_path: str) -> List[dict]:
         ]
       }
     """
-    with open(manifest_path, "r", encoding="utf-8") as f:
-        obj = json.load(f)
+    obj = _load_json(manifest_path)
 
     if isinstance(obj, list):
         docs = obj
@@ -73,15 +171,58 @@ def sha256_manifest_json(path: str) -> str:
     Stable hash of manifest.json content.
 
     We canonicalize JSON (sort_keys=True) so hash does not change
-    due to whitespace or key order differences.
-    """
-    with open(path, "r", encoding="utf-8") as f:
-        obj = json.load(f)
+    due to whitespace or key order differences. The canonical form is
+    stdlib json.dumps output, so existing source_manifest_hash values
+    stay valid; only parsing goes through orjson.
 
-    canonical = json.dumps(obj, ensure_ascii=False, sort_keys=True)
+    Reuses the parsed object cached by load_manifest_docs(), so the
+    manifest is read and parsed once per run.
+    """
+    canonical = json.dumps(_load_json(path), ensure_ascii=False, sort_keys=True)
     return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
 
 
+def cached_sha256_manifest_json(path: str) -> str:
+    """
+    sha256_manifest_json() memoized on disk, keyed by (path, mtime_ns, size).
+
+    Repeat runs against an unchanged manifest cost one stat() instead of a
+    read, parse and hash. A missing or corrupt cache file is rebuilt; a
+    cache that cannot be written is skipped.
+    """
+    st = os.stat(path)
+    prefix = f"{os.path.abspath(path)}:"
+    key = f"{prefix}{st.st_mtime_ns}:{st.st_size}"
+
+    try:
+        with open(HASH_CACHE_PATH, "rb") as f:
+            cache = orjson.loads(f.read())
+    except (OSError, orjson.JSONDecodeError):
+        cache = {}
+    if not isinstance(cache, dict):
+        cache = {}
+
+    digest = cache.get(key)
+    if digest is not None:
+        return digest
+
+    digest = sha256_manifest_json(path)
+
+    # Keep a single entry per manifest path
+    cache = {k: v for k, v in cache.items() if not k.startswith(prefix)}
+    cache[key] = digest
+    try:
+        os.makedirs(os.path.dirname(HASH_CACHE_PATH), exist_ok=True)
+        tmp_path = f"{HASH_CACHE_PATH}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(orjson.dumps(cache))
+        os.replace(tmp_path, HASH_CACHE_PATH)
+    except OSError:
+        pass
+
+    return digest
+
+
 def verify_embeddings_match_manifest(manifest_path: str, embedding_info: dict) -> None:
     """
     Fail fast if the current manifest.json does not match the manifest used
@@ -91,7 +232,7 @@ def verify_embeddings_match_manifest(manifest_path: str, embedding_info: dict) -
     if not expected:
         raise ValueError("Embedding manifest missing 'source_manifest_hash'.")
 
-    current = sha256_manifest_json(manifest_path)
+    current = cached_sha256_manifest_json(manifest_path)
     if current != expected:
         raise RuntimeError(
             "Embeddings/manifest mismatch.\n"
@@ -101,6 +242,43 @@ def verify_embeddings_match_manifest(manifest_path: str, embedding_info: dict) -
         )
 
 
+def verify_embeddings_normalized(embedding_info: dict) -> None:
+    """
+    Fail fast if cached doc vectors are not unit length.
+
+    Retrieval scores cosine similarity as a plain dot product against a
+    normalized query, which is only valid when the doc vectors were
+    normalized at precompute time (embeddings_manifest.normalized).
+    """
+    if embedding_info.get("normalized") is False:
+        raise RuntimeError(
+            "Cached doc embeddings are not normalized; cosine-by-dot-product "
+            "would be invalid.\n\n"
+            "Fix: re-run `python -m src.retrieval.doc_embeddings` to regenerate cached embeddings."
+        )
+
+
+def verify_embedding_dim(
+    doc_vecs: np.ndarray, embedder_dim: int, embedding_info: Optional[dict]
+) -> None:
+    """
+    Fail fast if the cached vectors, the embeddings manifest and the query
+    embedder disagree on dimension. Checked once per run, not per query.
+    """
+    doc_dim = doc_vecs.shape[1]
+    if doc_dim != embedder_dim:
+        raise ValueError(
+            f"Dimension mismatch: query dim {embedder_dim} != doc dim {doc_dim}"
+        )
+
+    expected = embedding_info.get("embedding_dim") if embedding_info else None
+    if expected is not None and expected != doc_dim:
+        raise ValueError(
+            f"Dimension mismatch: embeddings_manifest.embedding_dim {expected} "
+            f"!= doc dim {doc_dim}"
+        )
+
+
 def validate_manifest_tiers(docs: List[dict], tier_multipliers: dict) -> None:
     """
     Fail fast if manifest contains tiers not present in config.
@@ -115,6 +293,80 @@ def validate_manifest_tiers(docs: List[dict], tier_multipliers: dict) -> None:
         )
 
 
+def run_query(
+    query: str,
+    config: dict,
+    embedder: LocalEmbedder,
+    doc_vecs: np.ndarray,
+    meta: DocMeta,
+    top_k: Optional[int] = None,
+    mults: Optional[np.ndarray] = None,
+    sim_buffer: Optional[np.ndarray] = None,
+) -> List[dict]:
+    """
+    Score one query against preloaded retrieval artifacts.
+
+    No file I/O, printing or logging: callers load the embedder, vectors
+    and metadata once and reuse them across queries, so each further
+    query costs one embed (memoized for repeats) and one matmul.
+
+    Optional reuse across queries:
+        - mults: output of tier_multiplier_vector() for this config
+        - sim_buffer: float32 buffer of shape (N,), see cosine_raw_sim()
+
+    Returns
+    -------
+    List[dict]
+        Up to top_k results, best weighted score first.
+    """
+    tier_multipliers = config["retrieval"]["tier_multipliers"]
+    if top_k is None:
+        top_k = config["retrieval"]["top_k"]
+    if mults is None:
+        mults = tier_multiplier_vector(meta, tier_multipliers)
+
+    q_vec = embedder.embed(query, normalize=True)
+
+    candidates = build_candidates(q_vec, doc_vecs=doc_vecs, meta=meta, out=sim_buffer)
+    doc_ids = candidates["doc_ids"]
+    tiers = candidates["tiers"]
+    sims = candidates["raw_sim"]
+
+    weighted, top = score_and_top_k(sims, mults, top_k)
+
+    # Scoring and ranking stay in NumPy; Python objects are only built
+    # for the selected rows.
+    raw_ranks = rank_of(sims, top)
+    weighted_ranks = np.arange(1, top.shape[0] + 1)
+
+    return [
+        {
+            "doc_id": doc_id,
+            "tier": tier,
+            "similarity": similarity,
+            "multiplier": tier_multipliers[tier],
+            "weighted_score": weighted_score,
+            "raw_rank": raw_rank,
+            "weighted_rank": weighted_rank,
+            "rank_delta": raw_rank - weighted_rank,
+        }
+        for doc_id, tier, similarity, weighted_score, raw_rank, weighted_rank in zip(
+            doc_ids[top].tolist(),
+            tiers[top].tolist(),
+            sims[top].tolist(),
+            weighted[top].tolist(),
+            raw_ranks.tolist(),
+            weighted_ranks.tolist(),
+        )
+    ]
+
+
+@functools.lru_cache(maxsize=None)
+def _run_user() -> str:
+    """Resolve the OS user once per process (may hit the passwd database)."""
+    return getpass.getuser()
+
+
 def log_run(
     top_results: List[dict],
     config: dict,
@@ -123,51 +375,56 @@ def log_run(
     top_k: int,
     embedding_info: Optional[dict] = None,
 ) -> None:
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    timestamp = time.strftime("%Y%m%d_%H%M%S")
     log_filename = f"logs/riswis_run_{timestamp}.log"
 
     os.makedirs("logs", exist_ok=True)
 
-    run_user = getpass.getuser()
+    run_user = _run_user()
     seed = config["retrieval"].get("seed", None)
 
-    with open(log_filename, "w", encoding="utf-8") as log_file:
-        log_file.write("RISWIS Run Log\n")
-        log_file.write(f"Timestamp: {timestamp}\n")
-        log_file.write(f"User: {run_user}\n")
-        log_file.write(f"Reason: {run_reason}\n")
-        log_file.write(f"Seed: {seed}\n\n")
-
-        log_file.write(f"Query: {query}\n\n")
-
-        log_file.write("Configuration:\n")
-        log_file.write(f"top_k: {top_k}\n")
-        log_file.write(
-            f"tier_multipliers: {config['retrieval']['tier_multipliers']}\n\n"
+    parts: List[str] = [
+        "RISWIS Run Log\n",
+        f"Timestamp: {timestamp}\n",
+        f"User: {run_user}\n",
+        f"Reason: {run_reason}\n",
+        f"Seed: {seed}\n\n",
+        f"Query: {query}\n\n",
+        "Configuration:\n",
+        f"top_k: {top_k}\n",
+        f"tier_multipliers: {config['retrieval']['tier_multipliers']}\n\n",
+    ]
+
+    if embedding_info:
+        parts.append("Embedding Context:\n")
+        parts.append(f"model_name: {embedding_info.get('model_name')}\n")
+        parts.append(f"embedding_dim: {embedding_info.get('embedding_dim')}\n")
+        parts.append(f"normalized: {embedding_info.get('normalized')}\n")
+        parts.append(
+            f"source_manifest_hash: {embedding_info.get('source_manifest_hash')}\n"
+        )
+        parts.append(f"created_at_utc: {embedding_info.get('created_at_utc')}\n\n")
+
+    parts.append("Results:\n")
+    for i, r in enumerate(top_results, start=1):
+        parts.append(
+            f"#{i} {r['doc_id']} | "
+            f"raw_rank={r['raw_rank']} | "
+            f"weighted_rank={r['weighted_rank']} | "
+            f"delta={r['rank_delta']:+d} | "
+            f"sim={r['similarity']:.3f} × mult({r['tier']})={r['multiplier']} "
+            f"=> weighted={r['weighted_score']:.3f}\n"
         )
 
-        if embedding_info:
-            log_file.write("Embedding Context:\n")
-            log_file.write(f"model_name: {embedding_info.get('model_name')}\n")
-            log_file.write(f"embedding_dim: {embedding_info.get('embedding_dim')}\n")
-            log_file.write(f"normalized: {embedding_info.get('normalized')}\n")
-            log_file.write(
-                f"source_manifest_hash: {embedding_info.get('source_manifest_hash')}\n"
-            )
-            log_file.write(
-                f"created_at_utc: {embedding_info.get('created_at_utc')}\n\n"
-            )
-
-        log_file.write("Results:\n")
-        for i, r in enumerate(top_results, start=1):
-            log_file.write(
-                f"#{i} {r['doc_id']} | "
-                f"raw_rank={r['raw_rank']} | "
-                f"weighted_rank={r['weighted_rank']} | "
-                f"delta={r['rank_delta']:+d} | "
-                f"sim={r['similarity']:.3f} × mult({r['tier']})={r['multiplier']} "
-                f"=> weighted={r['weighted_score']:.3f}\n"
-            )
+    # Build the whole log in memory, encode once, and write the bytes
+    # straight to the fd (no TextIOWrapper/BufferedWriter layers).
+    payload = memoryview("".join(parts).encode("utf-8"))
+    fd = os.open(log_filename, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        while payload:
+            payload = payload[os.write(fd, payload) :]
+    finally:
+        os.close(fd)
 
     print(f"\nLog written to: {log_filename}")
 
@@ -250,49 +507,21 @@ def main() -> int:
     if os.path.exists(embedding_manifest_path):
         embedding_info = load_embeddings_manifest(embedding_manifest_path)
         verify_embeddings_match_manifest(manifest_path, embedding_info)
+        verify_embeddings_normalized(embedding_info)
 
-    # Phase 2 retrieval: embed query -> raw cosine similarities
-    embedder = LocalEmbedder(model_name="all-MiniLM-L6-v2")
-    q_vec = embedder.embed(query, normalize=True)
-
-    candidates = build_candidates(q_vec)
-
-    results: List[dict] = []
-    for c in candidates:
-        doc_id = c["doc_id"]
-        tier = c["tier"]
-        similarity = c["raw_sim"]
-
-        # Tier already validated against config, but keep guard anyway
-        if tier not in tier_multipliers:
-            raise ValueError(f"Unknown tier '{tier}' in manifest/config.")
-
-        multiplier = tier_multipliers[tier]
-        weighted_score = similarity * multiplier
-
-        results.append(
-            {
-                "doc_id": doc_id,
-                "tier": tier,
-                "similarity": similarity,
-                "multiplier": multiplier,
-                "weighted_score": weighted_score,
-            }
-        )
+    # Load cached retrieval artifacts once and derive per-row multipliers
+    # from the embedded tiers (guards against stale caches as well)
+    doc_vecs = load_doc_vectors()
+    meta = load_doc_meta()
+    mults = tier_multiplier_vector(meta, tier_multipliers)
 
-    # Rank by raw similarity first
-    raw_ranked = sorted(results, key=lambda x: x["similarity"], reverse=True)
-    for i, r in enumerate(raw_ranked, start=1):
-        r["raw_rank"] = i
-
-    # Rank by weighted governance score
-    weighted_ranked = sorted(results, key=lambda x: x["weighted_score"], reverse=True)
-    for i, r in enumerate(weighted_ranked, start=1):
-        r["weighted_rank"] = i
-        r["rank_delta"] = r["raw_rank"] - r["weighted_rank"]
+    # Phase 2 retrieval: embed query -> raw cosine similarities -> policy
+    embedder = LocalEmbedder(model_name="all-MiniLM-L6-v2")
+    verify_embedding_dim(doc_vecs, embedder.dim, embedding_info)
 
-    results = weighted_ranked
-    top_results = results[:top_k]
+    top_results = run_query(
+        query, config, embedder, doc_vecs, meta, top_k=top_k, mults=mults
+    )
 
     if args.json:
         payload = {
@@ -323,7 +552,7 @@ def main() -> int:
                 for r in top_results
             ],
         }
-        print(json.dumps(payload, ensure_ascii=False, indent=2))
+        print(orjson.dumps(payload, option=orjson.OPT_INDENT_2).decode("utf-8"))
     else:
         print("\nRanked results:")
         for r in top_results:
@@ -10,6 +10,8 @@ Runs:
     - prints candidates sorted by raw_sim
 """
 
+import numpy as np
+
 from src.retrieval.embedder import LocalEmbedder
 from src.retrieval.similarity import build_candidates
 
@@ -20,8 +22,14 @@ if __name__ == "__main__":
     q_vec = emb.embed(query, normalize=True)
 
     cands = build_candidates(q_vec)
-    cands = sorted(cands, key=lambda x: x["raw_sim"], reverse=True)
+    order = np.argsort(-cands["raw_sim"], kind="stable")
 
     print("Query:", query)
-    for c in cands:
-        print(c)
+    for i in order:
+        print(
+            {
+                "doc_id": str(cands["doc_ids"][i]),
+                "tier": str(cands["tiers"][i]),
+                "raw_sim": float(cands["raw_sim"][i]),
+            }
+        )
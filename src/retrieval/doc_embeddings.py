@@ -15,7 +15,7 @@ This script:
     - Writes embeddings to disk for fast, repeatable retrieval
 
 Outputs (aligned by row_index):
-    - data/doc_embeddings.npz        (numpy array "vectors" of shape: N x dim)
+    - data/doc_embeddings.npy        (float32 array of shape: N x dim, mmap-able)
     - data/doc_meta.jsonl            (one JSON record per doc with row_index mapping)
     - data/embeddings_manifest.json  (minimal metadata about the embedding run)
 
@@ -35,6 +35,8 @@ from pathlib import Path
 from typing import Any, Dict, List
 
 import numpy as np
+import orjson
+from blake3 import blake3
 
 from src.retrieval.embedder import LocalEmbedder
 
@@ -42,14 +44,20 @@ ROOT = Path(__file__).resolve().parents[2]  # repo root
 DATA_DIR = ROOT / "data"
 
 MANIFEST_FILENAME = "manifest.json"
-EMBEDDINGS_FILENAME = "doc_embeddings.npz"
+EMBEDDINGS_FILENAME = "doc_embeddings.npy"
 META_FILENAME = "doc_meta.jsonl"
 EMBEDDINGS_MANIFEST_FILENAME = "embeddings_manifest.json"
 
+EMBED_BATCH_SIZE = 64
 
-def sha256_text(text: str) -> str:
-    """Stable hash for content identity checks and cache validation."""
-    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def blake3_text(text: str) -> str:
+    """
+    Stable hash for content identity checks and cache validation.
+
+    Not a security boundary, so the faster BLAKE3 is used instead of SHA-256.
+    """
+    return blake3(text.encode("utf-8")).hexdigest()
 
 
 def sha256_manifest_json(path: Path) -> str:
@@ -57,8 +65,9 @@ def sha256_manifest_json(path: Path) -> str:
     Stable hash of manifest.json content.
 
     Canonicalizes JSON so hash doesn't change due to whitespace or key order.
+    Must produce the same digest as src.main.sha256_manifest_json.
     """
-    obj = json.loads(path.read_text(encoding="utf-8"))
+    obj = orjson.loads(path.read_bytes())
     canonical = json.dumps(obj, ensure_ascii=False, sort_keys=True)
     return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
 
@@ -94,8 +103,8 @@ def load_manifest(manifest_path: Path) -> List[Dict[str, Any]]:
         - tier
         - one of: content OR path
     """
-    with open(manifest_path, "r", encoding="utf-8") as f:
-        docs = json.load(f)
+    with open(manifest_path, "rb") as f:
+        docs = orjson.loads(f.read())
 
     if not isinstance(docs, list) or len(docs) == 0:
         raise ValueError(f"Expected a non-empty list in {manifest_path}")
@@ -158,11 +167,11 @@ def write_embeddings_and_meta(
         - vectors[i] corresponds to docs[i]
         - meta records include row_index for deterministic alignment
     """
-    # Save vectors (compressed)
-    np.savez_compressed(out_vec_path, vectors=vectors.astype(np.float32))
+    # Save vectors uncompressed as raw .npy so readers can memory-map them
+    np.save(out_vec_path, np.ascontiguousarray(vectors, dtype=np.float32))
 
     # Save aligned metadata as JSONL
-    with open(out_meta_path, "w", encoding="utf-8") as f:
+    with open(out_meta_path, "wb") as f:
         for i, (d, text) in enumerate(zip(docs, resolved_texts)):
             rec = {
                 "row_index": i,
@@ -171,9 +180,9 @@ def write_embeddings_and_meta(
                 "source": d.get("source"),
                 "title": d.get("title"),
                 "path": d.get("path"),
-                "content_hash": sha256_text(text),
+                "content_hash_blake3": blake3_text(text),
             }
-            f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+            f.write(orjson.dumps(rec) + b"\n")
 
 
 def write_embedding_manifest(
@@ -188,6 +197,9 @@ def write_embedding_manifest(
     Write minimal metadata describing how the current doc embeddings were produced.
 
     Scope: intentionally minimal.
+
+    `normalized` is a contract for readers: when True, retrieval scores
+    cosine similarity as a plain dot product without renormalizing docs.
     """
     source_manifest_hash = sha256_manifest_json(source_manifest_path)
 
@@ -199,8 +211,8 @@ def write_embedding_manifest(
         "created_at_utc": datetime.now(timezone.utc).isoformat(),
     }
 
-    with open(out_path, "w", encoding="utf-8") as f:
-        json.dump(record, f, indent=2)
+    with open(out_path, "wb") as f:
+        f.write(orjson.dumps(record, option=orjson.OPT_INDENT_2))
 
 
 def main() -> None:
@@ -213,7 +225,7 @@ def main() -> None:
 
     normalized = True
     vectors = embedder.embed(
-        resolved_texts, normalize=normalized
+        resolved_texts, normalize=normalized, batch_size=EMBED_BATCH_SIZE
     )  # normalized vectors for cosine
 
     out_vec_path = DATA_DIR / EMBEDDINGS_FILENAME
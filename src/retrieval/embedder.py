@@ -24,10 +24,12 @@ Downstream similarity and ranking layers consume these vectors.
 from __future__ import annotations
 
 from typing import List, Union
+import functools
 import logging
 import os
 
 import numpy as np
+import torch
 
 # --- Silence Hugging Face / SentenceTransformers non-error noise (optional, UX-friendly) ---
 # Keep real exceptions visible; suppress routine model-load chatter.
@@ -51,6 +53,56 @@ logging.getLogger("huggingface_hub").setLevel(logging.ERROR)
 
 from sentence_transformers import SentenceTransformer
 
+DEFAULT_BATCH_SIZE = 64
+
+
+@functools.lru_cache(maxsize=4)
+def _get_model(model_name: str, fp16: bool = False) -> SentenceTransformer:
+    """
+    Load a SentenceTransformer once per (model name, precision) and process.
+
+    Loading reads the full weights from disk and initializes torch, which
+    dominates the cost of a single query. fp16 only applies on CUDA.
+    """
+    model = SentenceTransformer(model_name)
+    if fp16 and model.device.type == "cuda":
+        model.half()
+    return model
+
+
+def _encode(
+    model: SentenceTransformer,
+    texts: List[str],
+    normalize: bool,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> np.ndarray:
+    # encode() already length-sorts texts before batching, so each batch
+    # pads to a near-minimal length without extra work here.
+    with torch.inference_mode():
+        vectors = model.encode(
+            texts,
+            batch_size=batch_size,
+            convert_to_numpy=True,
+            normalize_embeddings=normalize,
+            show_progress_bar=False,
+        )
+
+    return np.asarray(vectors, dtype=np.float32)
+
+
+@functools.lru_cache(maxsize=256)
+def _embed_text_cached(
+    model_name: str, fp16: bool, text: str, normalize: bool
+) -> np.ndarray:
+    """
+    Embed a single string, memoized per (model_name, fp16, text, normalize).
+
+    The returned array is shared between callers and marked read-only.
+    """
+    vectors = _encode(_get_model(model_name, fp16), [text], normalize)
+    vectors.flags.writeable = False
+    return vectors
+
 
 class LocalEmbedder:
     """
@@ -61,6 +113,10 @@ class LocalEmbedder:
     model_name : str
         HuggingFace model identifier. Default is
         'all-MiniLM-L6-v2' (384-dimensional embeddings).
+    fp16 : bool
+        If True and the model runs on CUDA, run it in half precision.
+        Off by default: it changes vector values, so document and query
+        embeddings must be produced with the same setting.
 
     Notes
     -----
@@ -77,17 +133,25 @@ class LocalEmbedder:
         - torch version
 
     Changing any of the above may change vector values.
+
+    Caching
+    -------
+    The underlying model is loaded once per model name and process, so
+    constructing several embedders is cheap. Single-string queries are
+    memoized and returned as read-only arrays.
     """
 
-    def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
+    def __init__(self, model_name: str = "all-MiniLM-L6-v2", fp16: bool = False):
         self.model_name = model_name
-        self.model = SentenceTransformer(model_name)
+        self.fp16 = fp16
+        self.model = _get_model(model_name, fp16)
         self.dim = int(self.model.get_sentence_embedding_dimension())
 
     def embed(
         self,
         texts: Union[str, List[str]],
         normalize: bool = True,
+        batch_size: int = DEFAULT_BATCH_SIZE,
     ) -> np.ndarray:
         """
         Generate embeddings for input text(s).
@@ -98,23 +162,20 @@ class LocalEmbedder:
             Single string or list of strings to embed.
         normalize : bool
             If True, returns unit-length vectors.
+        batch_size : int
+            Texts per forward pass. Tune to the hardware for bulk
+            precompute; irrelevant for a single query string.
 
         Returns
         -------
         np.ndarray
-            Shape (N, dim) float32 array.
+            Shape (N, dim) float32 array. Read-only for a single string
+            input, since the result is served from the query cache.
         """
         if isinstance(texts, str):
-            texts = [texts]
-
-        vectors = self.model.encode(
-            texts,
-            convert_to_numpy=True,
-            normalize_embeddings=normalize,
-            show_progress_bar=False,
-        )
+            return _embed_text_cached(self.model_name, self.fp16, texts, normalize)
 
-        return np.asarray(vectors, dtype=np.float32)
+        return _encode(self.model, texts, normalize, batch_size)
 
 
 if __name__ == "__main__":
@@ -7,7 +7,7 @@ RISWIS – Phase 2 Retrieval Layer
 Similarity computation over cached document embeddings.
 
 This module:
-    - Loads cached document vectors (data/doc_embeddings.npz)
+    - Loads cached document vectors (data/doc_embeddings.npy, memory-mapped)
     - Loads aligned doc metadata (data/doc_meta.jsonl)
     - Computes raw similarity scores between a query vector and doc vectors
 
@@ -18,29 +18,56 @@ Architectural Boundary:
     - Does NOT implement governance logic
 
 Output Contract:
-    Produces candidates shaped like:
-        {"doc_id": str, "tier": str, "raw_sim": float}
+    Produces candidates as aligned columns (one row per doc):
+        {"doc_ids": np.ndarray[str], "tiers": np.ndarray[str],
+         "raw_sim": np.ndarray[float32]}
 
-These candidates are consumed by the Phase 1 policy layer (rank_results()).
+These candidates are consumed by the Phase 1 policy layer (src/main.py).
 """
 
-import json
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Dict, Optional, Tuple
 
 import numpy as np
+import orjson
 
 ROOT = Path(__file__).resolve().parents[2]  # repo root
 DATA_DIR = ROOT / "data"
 
-EMBEDDINGS_FILENAME = "doc_embeddings.npz"
+EMBEDDINGS_FILENAME = "doc_embeddings.npy"
 META_FILENAME = "doc_meta.jsonl"
 
 
+@dataclass(frozen=True)
+class DocMeta:
+    """
+    Columnar doc metadata aligned by row_index.
+
+    Tiers are stored as small integer codes into `tier_vocab`, so the
+    policy layer can map multipliers with one lookup table per run.
+    """
+
+    doc_ids: np.ndarray  # shape (N,), str
+    tier_codes: np.ndarray  # shape (N,), unsigned int codes into tier_vocab
+    tier_vocab: Tuple[str, ...]
+
+    def __len__(self) -> int:
+        return self.doc_ids.shape[0]
+
+    @property
+    def tiers(self) -> np.ndarray:
+        """Decoded tier labels, shape (N,)."""
+        return np.array(self.tier_vocab, dtype=str)[self.tier_codes]
+
+
 def load_doc_vectors() -> np.ndarray:
     """
     Load cached document embedding vectors.
 
+    The file is memory-mapped read-only; pages are read on first touch
+    and no copy is made when the stored dtype is already float32.
+
     Returns
     -------
     np.ndarray
@@ -51,101 +78,130 @@ def load_doc_vectors() -> np.ndarray:
     if not vec_path.exists():
         raise FileNotFoundError(f"Missing embeddings file: {vec_path}")
 
-    data = np.load(vec_path)
-    vectors = data["vectors"]
+    vectors = np.load(vec_path, mmap_mode="r")
 
-    return vectors.astype(np.float32)
+    if vectors.dtype == np.float32:
+        return vectors
 
+    return np.ascontiguousarray(vectors, dtype=np.float32)
 
-def load_doc_meta() -> List[Dict[str, Any]]:
+
+def load_doc_meta() -> DocMeta:
     """
     Load doc metadata aligned by row_index.
 
+    Only the columns needed for retrieval (doc_id, tier) are kept.
+
     Returns
     -------
-    List[dict]
-        Each record contains row_index, doc_id, tier, etc.
+    DocMeta
+        doc_ids, tier_codes and tier_vocab columns.
     """
     meta_path = DATA_DIR / META_FILENAME
 
     if not meta_path.exists():
         raise FileNotFoundError(f"Missing metadata file: {meta_path}")
 
-    meta: List[Dict[str, Any]] = []
+    with open(meta_path, "rb") as f:
+        raw = f.read()
 
-    with open(meta_path, "r", encoding="utf-8") as f:
-        for line in f:
-            meta.append(json.loads(line))
+    # Parse the whole file as one JSON array in a single orjson call.
+    # JSONL records never contain raw newlines, so splitting is safe.
+    lines = [line for line in raw.splitlines() if line.strip()]
+    records = orjson.loads(b"[" + b",".join(lines) + b"]")
 
-    return meta
+    tier_vocab, tier_codes = np.unique(
+        np.array([r["tier"] for r in records], dtype=str), return_inverse=True
+    )
 
+    return DocMeta(
+        doc_ids=np.array([r["doc_id"] for r in records], dtype=str),
+        tier_codes=tier_codes.astype(np.min_scalar_type(max(len(tier_vocab) - 1, 0))),
+        tier_vocab=tuple(tier_vocab.tolist()),
+    )
 
-def cosine_raw_sim(query_vec: np.ndarray, doc_vecs: np.ndarray) -> np.ndarray:
+
+def cosine_raw_sim(
+    query_vec: np.ndarray,
+    doc_vecs: np.ndarray,
+    out: Optional[np.ndarray] = None,
+) -> np.ndarray:
     """
     Compute cosine similarity scores.
 
     Assumes embeddings are normalized (unit length). Under normalization:
         cosine(q, d) = dot(q, d)
 
+    Doc vectors are normalized once at precompute time and recorded as
+    `normalized` in embeddings_manifest.json; they are never renormalized
+    here.
+
+    Dimensions are not re-checked here; callers validate the cached
+    vectors against the embedder once per run.
+
     Parameters
     ----------
     query_vec : np.ndarray
-        Shape (dim,) or (1, dim)
+        Shape (1, dim), as returned by LocalEmbedder.embed().
     doc_vecs : np.ndarray
         Shape (N, dim)
+    out : np.ndarray, optional
+        Caller-owned float32 buffer of shape (N,), reused across queries
+        to avoid a per-query allocation. Overwritten on each call.
 
     Returns
     -------
     np.ndarray
-        Shape (N,) float32 similarity scores.
+        Shape (N,) float32 similarity scores (`out` if given).
     """
-    q = query_vec[0] if query_vec.ndim == 2 else query_vec
-
-    if q.shape[0] != doc_vecs.shape[1]:
-        raise ValueError(
-            f"Dimension mismatch: query dim {q.shape[0]} "
-            f"!= doc dim {doc_vecs.shape[1]}"
-        )
+    if out is None:
+        out = np.empty(doc_vecs.shape[0], dtype=np.float32)
 
-    return (doc_vecs @ q).astype(np.float32)
+    return np.matmul(doc_vecs, query_vec[0], out=out)
 
 
-def build_candidates(query_vec: np.ndarray) -> List[Dict[str, Any]]:
+def build_candidates(
+    query_vec: np.ndarray,
+    doc_vecs: Optional[np.ndarray] = None,
+    meta: Optional[DocMeta] = None,
+    out: Optional[np.ndarray] = None,
+) -> Dict[str, np.ndarray]:
     """
-    Build candidate list for the policy layer.
+    Build candidate columns for the policy layer.
 
-    Output records contain only:
-        - doc_id
-        - tier
+    Output columns (aligned by row_index):
+        - doc_ids
+        - tiers
         - raw_sim
 
     Parameters
     ----------
     query_vec : np.ndarray
         Query embedding vector (normalized preferred).
+    doc_vecs : np.ndarray, optional
+        Preloaded output of load_doc_vectors(); loaded if omitted.
+    meta : DocMeta, optional
+        Preloaded output of load_doc_meta(); loaded if omitted.
+    out : np.ndarray, optional
+        Reusable raw_sim buffer, see cosine_raw_sim().
 
     Returns
     -------
-    List[dict]
-        Candidate list to pass into rank_results().
+    Dict[str, np.ndarray]
+        Candidate columns for the policy layer.
     """
-    doc_vecs = load_doc_vectors()
-    meta = load_doc_meta()
+    if doc_vecs is None:
+        doc_vecs = load_doc_vectors()
+    if meta is None:
+        meta = load_doc_meta()
 
     if len(meta) != doc_vecs.shape[0]:
         raise ValueError("Metadata row count does not match embedding row count.")
 
-    sims = cosine_raw_sim(query_vec, doc_vecs)
-
-    candidates: List[Dict[str, Any]] = []
-
-    for i, m in enumerate(meta):
-        candidates.append(
-            {
-                "doc_id": m["doc_id"],
-                "tier": m["tier"],
-                "raw_sim": float(sims[i]),
-            }
-        )
+    sims = cosine_raw_sim(query_vec, doc_vecs, out=out)
 
-    return candidates
+    return {
+        "doc_ids": meta.doc_ids,
+        "tiers": meta.tiers,
+        "raw_sim": sims,
+    }